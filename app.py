@@ -2,22 +2,61 @@
 # Streamlit: Excel → (BEX / NON-BEX) DOCX generator — stable build
 
 import io
+import os
 import re
+import tempfile
+import time
 import zipfile
 import datetime as dt
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, repeat
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Iterator
+from xml.sax.saxutils import escape as xml_escape
 
 import streamlit as st
 import pandas as pd
 from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+try:  # Rust xlsx reader, much faster than openpyxl on big sheets (pandas >= 2.2)
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
+try:  # optional "fast reader": polars on calamine, handed to pandas via Arrow
+    import polars as pl
+    import fastexcel
+    import pyarrow  # noqa: F401
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
 
 # ───────────────────────────── Config ─────────────────────────────
 st.set_page_config(page_title="Excel → Review/Plan (BEX & Non-BEX)", layout="wide")
 TODAY = dt.date.today()
+TEST_MODE_ROWS = 50
+PROGRESS_INTERVAL = 0.25  # seconds between progress bar refreshes
+RENDER_WORKERS = os.cpu_count() or 4
+RENDER_WINDOW = 4 * RENDER_WORKERS  # rendered .docx kept in RAM waiting for the zip
+BEX_YES_VALUES = frozenset({"yes", "y", "1", "true", "ναι"})
 
 # ───────────────────────── Helpers ─────────────────────────
 _RX_PH = re.compile(r"\[\[([A-Za-z0-9_]+)\]\]")  # [[key]]
+_RX_PH_B = re.compile(rb"\[\[([A-Za-z0-9_]+)\]\]")  # same, on raw XML bytes
+_RX_TEXT_PART = re.compile(r"word/(document|header\d*|footer\d*)\.xml")  # parts with placeholders
+_RX_NON_ALNUM = re.compile(r"[^a-z0-9]+")  # header normalization
+_RX_WT_OPEN = re.compile(rb"<w:t(?:\s[^>]*)?>")  # opening tag of a run's text
+_RX_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")  # not allowed in XML 1.0
+_W_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+_W_TAB = '</w:t><w:tab/><w:t xml:space="preserve">'
+_NA_STRINGS = frozenset({"", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+                         "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"})  # pandas' default na_values
+_ZIP_DATE_TIME = (TODAY.year, TODAY.month, TODAY.day, 0, 0, 0)  # one stamp for every entry
 
 def format_percent(val: Any) -> str:
     """Turn 1.22 -> 122%, 0.87 -> 87%, keep strings as-is."""
@@ -40,47 +79,122 @@ def tidy_number(v: Any) -> Any:
     except Exception:
         return v
 
-def _replace_in_paragraph(par, mapping: Dict[str, Any]):
-    full = "".join(r.text for r in par.runs)
-    def subfun(m):
-        k = m.group(1)
-        v = mapping.get(k, "")
-        return "" if v is None else str(v)
-    new_text = _RX_PH.sub(subfun, full)
-    for r in list(par.runs):
-        r._element.getparent().remove(r._element)
-    par.add_run(new_text)
-
-def replace_placeholders_robust(doc: Document, mapping: Dict[str, Any]):
-    """Safe replacement in paragraphs + all table cells (handles split runs)."""
-    for p in doc.paragraphs:
-        _replace_in_paragraph(p, mapping)
-    for t in doc.tables:
-        for row in t.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    _replace_in_paragraph(p, mapping)
-
-def extract_placeholders_from_docx(doc: Document) -> set[str]:
-    found = set()
-    def scan(s: str):
-        for m in _RX_PH.finditer(s or ""):
-            found.add(m.group(1))
-    for p in doc.paragraphs:
-        scan("".join(r.text for r in p.runs))
-    for t in doc.tables:
-        for row in t.rows:
-            for cell in row.cells:
-                for p in cell.paragraphs:
-                    scan("".join(r.text for r in p.runs))
-    return found
+def zip_entry(name: str, compress_type: int) -> zipfile.ZipInfo:
+    """ZipInfo with a fixed timestamp, so writestr() doesn't stat the clock per entry.
+    A fresh one per entry: writestr() fills sizes/offsets into it."""
+    zinfo = zipfile.ZipInfo(name, date_time=_ZIP_DATE_TIME)
+    zinfo.compress_type = compress_type
+    zinfo.external_attr = 0o644 << 16
+    return zinfo
+
+def encode_text(v: Any) -> bytes:
+    """Value → bytes for inside <w:t>: drop XML-illegal chars (e.g. \x0b from _x000B_),
+    escape, and turn newlines/tabs into <w:br/>/<w:tab/> like python-docx's run.text."""
+    s = _RX_XML_ILLEGAL.sub("", "" if v is None else str(v))
+    s = xml_escape(s).replace("\r\n", "\n").replace("\r", "\n")
+    return s.replace("\n", _W_BREAK).replace("\t", _W_TAB).encode()
+
+def _split_text_slots(data: bytes) -> list[bytes]:
+    """Split part XML into [xml, key, xml, key, …, xml]; only [[key]] inside <w:t> text
+    becomes a slot (placeholders in attributes stay literal)."""
+    chunks, pos = [], 0
+    for m in _RX_PH_B.finditer(data):
+        wt = _RX_WT_OPEN.match(data, data.rfind(b"<", 0, m.start()))
+        if wt is None or wt.end() > m.start():
+            continue
+        chunks += [data[pos:m.start()], m.group(1)]
+        pos = m.end()
+    chunks.append(data[pos:])
+    return chunks
+
+def _merge_split_placeholders(par: Paragraph):
+    """Move every [[key]] that Word split over several runs into its first run."""
+    runs = par.runs
+    texts = [r.text for r in runs]
+    full = "".join(texts)
+    if "[[" not in full:
+        return
+    ends = list(accumulate(len(t) for t in texts))
+    touched = set()
+    # right to left: moving text inside a match never shifts earlier offsets
+    for m in reversed(list(_RX_PH.finditer(full))):
+        first = bisect_right(ends, m.start())
+        last = bisect_right(ends, m.end() - 1)
+        if first == last:
+            continue
+        texts[first] += "".join(texts[first + 1:last + 1])
+        for j in range(first + 1, last + 1):
+            texts[j] = ""
+        touched.update(range(first, last + 1))
+    for j in touched:
+        runs[j].text = texts[j]
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def prepare_template(tpl_bytes: bytes) -> Dict[str, bytes | list[bytes]]:
+    """Parse a .docx once: glue split placeholders, return its zip parts {name: bytes}.
+    Parts with placeholders come pre-split as [text, key, text, key, …, text]."""
+    doc = Document(io.BytesIO(tpl_bytes))
+    for part in doc.part.package.iter_parts():
+        if _RX_TEXT_PART.fullmatch(part.partname.lstrip("/")):
+            for p in part.element.iter(qn("w:p")):
+                _merge_split_placeholders(Paragraph(p, None))
+            for t in part.element.iter(qn("w:t")):
+                if t.text and "[[" in t.text:
+                    t.set(qn("xml:space"), "preserve")  # keep leading/trailing spaces of values
+    buf = io.BytesIO()
+    doc.save(buf)
+    parts: Dict[str, bytes | list[bytes]] = {}
+    with zipfile.ZipFile(buf) as zin:
+        for name in zin.namelist():
+            data = zin.read(name)
+            if b"[[" in data and _RX_TEXT_PART.fullmatch(name):
+                chunks = _split_text_slots(data)  # keys at odd positions
+                parts[name] = chunks if len(chunks) > 1 else data
+            else:
+                parts[name] = data
+    return parts
+
+def render_docx(parts: Dict[str, bytes | list[bytes]], mapping: Dict[str, Any]) -> memoryview:
+    """Fill the pre-split body/header/footer XML by joining chunks and re-zip the template parts."""
+    # escape + encode lazily: only keys the template uses, each at most once
+    bmap: Dict[bytes, bytes] = {}
+    def value(key: bytes) -> bytes:
+        val = bmap.get(key)
+        if val is None:
+            val = bmap[key] = encode_text(mapping.get(key.decode("ascii")))
+        return val
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+        for name, data in parts.items():
+            if isinstance(data, list):  # no regex per row: just drop values into the key slots
+                chunks = data.copy()
+                chunks[1::2] = [value(k) for k in data[1::2]]
+                data = b"".join(chunks)
+            zout.writestr(zip_entry(name, zipfile.ZIP_DEFLATED), data)
+    return out.getbuffer()  # zero-copy view; ZipFile.writestr takes any buffer
+
+def render_in_order(jobs: Iterable[tuple], workers: int, window: int) -> Iterator[tuple]:
+    """Render (i, out_name, parts, mapping) jobs on a thread pool, yield (i, out_name, future)
+    in job order; at most `window` jobs are in flight, so memory stays flat on big sheets."""
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending: deque = deque()
+        for i, out_name, parts, mapping in jobs:
+            pending.append((i, out_name, ex.submit(render_docx, parts, mapping)))
+            if len(pending) >= window:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+def extract_placeholders(parts: Dict[str, bytes | list[bytes]]) -> set[str]:
+    return {k.decode("ascii")
+            for data in parts.values() if isinstance(data, list)
+            for k in data[1::2]}
 
 def normalize_headers(cols: Iterable[str]) -> list[str]:
-    def norm(s: str) -> str:
-        s = str(s).strip().lower()
-        s = re.sub(r"[^a-z0-9]+", "_", s)  # spaces/greek → underscores
-        return s.strip("_")
-    return [norm(c) for c in cols]
+    """Vectorized over the whole header row with pandas string ops."""
+    s = pd.Index(cols).astype(str).str.strip().str.lower()
+    s = s.str.replace(_RX_NON_ALNUM, "_", regex=True)  # spaces/greek → underscores
+    return s.str.strip("_").tolist()
 
 def col_by_letter(df: pd.DataFrame, letter: str) -> str | None:
     """Map Excel column letter (e.g., 'N', 'AA') to df column name (0-based)."""
@@ -97,6 +211,85 @@ def col_by_letter(df: pd.DataFrame, letter: str) -> str | None:
         return df.columns[idx]
     return None
 
+@st.cache_resource(show_spinner=False, max_entries=2)
+def open_workbook(xls_bytes: bytes) -> pd.ExcelFile:
+    """Open the workbook once; the header pass and the data pass share it."""
+    return pd.ExcelFile(io.BytesIO(xls_bytes), engine=EXCEL_ENGINE)
+
+def sheet_width(xfile: pd.ExcelFile, sheet_name: str) -> int:
+    """Column count from the openpyxl sheet dimensions (rescanned once pandas has reset them)."""
+    ws = xfile.book[sheet_name]
+    if ws.max_column is None:
+        ws.calculate_dimension(force=True)
+    return ws.max_column or 0
+
+@st.cache_data(show_spinner=False, max_entries=3)
+def read_sheet(xls_bytes: bytes, sheet_name: str, max_rows: int | None = None,
+               usecols: tuple[int, ...] | None = None, fast: bool = False,
+               text_cols: tuple[int, ...] = ()) -> pd.DataFrame:
+    """Read one sheet; with max_rows only the first rows are parsed (test mode / headers),
+    with usecols only those 0-based column positions are converted, fast=True uses polars
+    (text_cols: positions whose cells stay text there, e.g. store codes like 00123).
+    Cached on the file content, so widget reruns don't re-parse the workbook."""
+    if fast and HAS_POLARS:
+        # keep blank columns/rows (letters and row numbers are positional) and type each
+        # column from all its cells, not the first rows (else late text codes become null)
+        try:
+            df = pl.read_excel(io.BytesIO(xls_bytes), sheet_name=sheet_name, engine="calamine",
+                               columns=list(usecols) if usecols is not None else None,
+                               drop_empty_cols=False, drop_empty_rows=False, infer_schema_length=None,
+                               read_options={"n_rows": max_rows} if max_rows is not None else None).to_pandas()
+        except ValueError:  # missing sheet: same message as the pandas path, without opening it twice
+            names = fastexcel.read_excel(xls_bytes).sheet_names
+            if sheet_name not in names:
+                raise ValueError(f"Το sheet '{sheet_name}' δεν βρέθηκε. Διαθέσιμα: {names}") from None
+            raise
+        # a column mixing numbers and text ("-", "N/A") comes back as strings: blank the cells
+        # pandas reads as NaN and put the numbers back, so tidy_number()/format_percent()
+        # round them the same way as with the pandas reader
+        for j, pos in enumerate(usecols if usecols is not None else range(df.shape[1])):
+            s = df.iloc[:, j]
+            if s.dtype == object:
+                s = s.mask(s.isin(_NA_STRINGS))
+                if pos not in text_cols:
+                    num = pd.to_numeric(s, errors="coerce")
+                    s = s.where(num.isna(), num)
+                df.isetitem(j, s)
+        return df
+    xfile = open_workbook(xls_bytes)
+    if sheet_name not in xfile.sheet_names:
+        raise ValueError(f"Το sheet '{sheet_name}' δεν βρέθηκε. Διαθέσιμα: {xfile.sheet_names}")
+    cols = list(usecols) if usecols is not None else None
+    if EXCEL_ENGINE == "openpyxl":
+        # openpyxl cuts each row after its last filled cell: nrows=0 would miss unheaded data
+        # columns right of the last header, and usecols past the data would raise → pad to
+        # the sheet's width and pick the positions here (usecols saves openpyxl no work anyway)
+        width = sheet_width(xfile, sheet_name) if cols is None else max(cols, default=-1) + 1
+        df = xfile.parse(sheet_name, nrows=max_rows)
+        df = df.reindex(columns=[*df.columns, *(f"Unnamed: {j}" for j in range(df.shape[1], width))])
+        return df if cols is None else df.iloc[:, cols]
+    return xfile.parse(sheet_name, nrows=max_rows, usecols=cols)
+
+def text_column(s: pd.Series) -> pd.Series:
+    """Vectorized str(tidy_number(v)).strip() for a whole column ("" for blanks)."""
+    if pd.api.types.is_float_dtype(s) and (s.dropna() % 1 == 0).all():
+        s = s.astype("Int64")  # codes read as 101.0 → "101"
+    elif pd.api.types.is_float_dtype(s) or s.dtype == object:
+        s = s.map(lambda v: str(tidy_number(v)), na_action="ignore")
+    return s.astype("string").str.strip().fillna("")
+
+def column_values(df: pd.DataFrame) -> list[list[Any]]:
+    """One value list per column: NaN → "", floats through tidy_number().
+    Plain lists, since Series.map would re-infer 221 → 221.0."""
+    df_vals = df.astype(object).where(df.notna(), "")  # NaN → "" in one vectorized pass
+    cols = []
+    for j, dtype in enumerate(df.dtypes):
+        vals = df_vals.iloc[:, j].tolist()
+        if dtype.kind in "fO":  # only floats (or mixed object columns) can need tidying
+            vals = [tidy_number(v) for v in vals]
+        cols.append(vals)
+    return cols
+
 def safe_get(row: pd.Series, col: str | None) -> Any:
     if not col or col not in row.index:
         return ""
@@ -125,11 +318,13 @@ st.divider()
 
 with st.expander("Ρυθμίσεις & BEX"):
     debug = st.toggle("🛠 Debug mode", value=False)
-    test_mode = st.toggle("🧪 Test mode (πρώτες 50 γραμμές)", value=False)
+    test_mode = st.toggle(f"🧪 Test mode (πρώτες {TEST_MODE_ROWS} γραμμές)", value=False)
+    fast_reader = st.toggle("⚡ Fast XLSX reader (Polars)", value=False, disabled=not HAS_POLARS,
+                            help="Χρειάζεται τα πακέτα polars, fastexcel και pyarrow.")
     st.write("**BEX detection**")
     bex_mode = st.radio("Πως βρίσκουμε αν είναι BEX;", ["Από στήλη (YES/NO)", "Από λίστα κωδικών"], index=1, horizontal=True)
     bex_list_input = st.text_input("BEX λίστα (comma separated)", value="DRZ01,FKM01,ESC01,LND01,PKK01").upper()
-    bex_list = set(s.strip() for s in bex_list_input.split(",") if s.strip())
+    bex_list = frozenset(s.strip() for s in bex_list_input.split(",") if s.strip())
 
 st.subheader("3) Mapping με γράμματα Excel")
 map_cols = {}
@@ -171,118 +366,160 @@ if start:
         st.error("Ανέβασε και τα δύο templates (.docx).")
         st.stop()
 
-    # read excel (no spinner to avoid indentation surprises)
+    # read excel in two steps: header row first, then only the columns we need
+    # test mode: parse only the rows we are going to use
     try:
-        xfile = pd.ExcelFile(xls)
-        if sheet_name not in xfile.sheet_names:
-            st.error(f"Το sheet '{sheet_name}' δεν βρέθηκε. Διαθέσιμα: {xfile.sheet_names}")
-            st.stop()
-        df_raw = pd.read_excel(xfile, sheet_name=sheet_name)
-        df = df_raw.copy()
-        df.columns = normalize_headers(df.columns)
+        xls_bytes = xls.getvalue()  # whole upload, independent of the file cursor
+        head = read_sheet(xls_bytes, sheet_name, max_rows=0, fast=fast_reader)
+        head.columns = normalize_headers(head.columns)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
     except Exception as e:
         st.error(f"Σφάλμα ανάγνωσης Excel: {e}")
         st.stop()
 
     # find store column (robust)
     store_col_candidates = ["shop_code", "shopcode", "store_code", "dealer_code", "dealer", "store", "code"]
-    store_col = next((c for c in store_col_candidates if c in df.columns), None)
+    store_col = next((c for c in store_col_candidates if c in head.columns), None)
     if not store_col:
-        store_col = df.columns[0]  # fallback
+        store_col = head.columns[0]  # fallback
 
-    # attach bex flag
+    bex_col = None
     if bex_mode == "Από στήλη (YES/NO)":
         bex_col_candidates = ["bex", "bex_store", "is_bex", "bex_yes_no"]
-        bex_col = next((c for c in bex_col_candidates if c in df.columns), None)
-        def _is_bex(row) -> bool:
-            val = str(safe_get(row, bex_col)).strip().lower()
-            return val in ("yes", "y", "1", "true", "ναι")
-    else:
-        def _is_bex(row) -> bool:
-            return str(safe_get(row, store_col)).strip().upper() in bex_list
+        bex_col = next((c for c in bex_col_candidates if c in head.columns), None)
 
     # map Excel letters → normalized df columns
-    letter_to_col: Dict[str, str | None] = {k: col_by_letter(df, v) for k, v in map_cols.items()}
+    letter_to_col: Dict[str, str | None] = {k: col_by_letter(head, v) for k, v in map_cols.items()}
 
     if debug:
         with st.expander("🔎 Mapping preview (letters → headers)"):
             st.json({k: {"letter": map_cols[k], "header": letter_to_col[k]} for k in map_cols})
-        st.write("Headers:", list(df.columns))
+        st.write("Headers:", list(head.columns))
 
-    # audit templates
-    tpl_bex_bytes = tpl_bex.read()
-    tpl_non_bytes = tpl_non.read()
-    doc_bex = Document(io.BytesIO(tpl_bex_bytes))
-    doc_non = Document(io.BytesIO(tpl_non_bytes))
-    ph_bex = extract_placeholders_from_docx(doc_bex)
-    ph_non = extract_placeholders_from_docx(doc_non)
+    # parse templates once; every row only re-fills document.xml
+    tpl_bex_parts = prepare_template(tpl_bex.getvalue())
+    tpl_non_parts = prepare_template(tpl_non.getvalue())
+    ph_bex = extract_placeholders(tpl_bex_parts)
+    ph_non = extract_placeholders(tpl_non_parts)
 
     with st.expander("🧪 Template audit (placeholders που βρέθηκαν στα .docx)"):
         st.write("BEX template placeholders:", sorted(ph_bex))
         st.write("NON-BEX template placeholders:", sorted(ph_non))
 
-    # generate per row
-    out_zip = io.BytesIO()
-    zf = zipfile.ZipFile(out_zip, "w", zipfile.ZIP_DEFLATED)
+    # keep only what a document can use: store/BEX, mapped letters, [[header]] placeholders
+    used_cols = {store_col, bex_col, *letter_to_col.values()} | ph_bex | ph_non
+    used_pos = tuple(j for j, c in enumerate(head.columns) if c in used_cols)
+    try:
+        df = read_sheet(xls_bytes, sheet_name, max_rows=TEST_MODE_ROWS if test_mode else None,
+                        usecols=used_pos, fast=fast_reader,
+                        text_cols=tuple(j for j in used_pos if head.columns[j] in (store_col, bex_col)))
+        df.columns = [head.columns[j] for j in used_pos]
+    except Exception as e:
+        st.error(f"Σφάλμα ανάγνωσης Excel: {e}")
+        st.stop()
+
+    # normalize store codes once and drop rows without a store
+    total_rows = len(df)
+    stores_up = text_column(df[store_col]).str.upper()
+    has_store = stores_up != ""
+    df, stores_up = df[has_store], stores_up[has_store]
+
+    # attach bex flag (vectorized)
+    if bex_mode == "Από στήλη (YES/NO)":
+        if bex_col:
+            is_bex_s = text_column(df[bex_col]).str.lower().isin(BEX_YES_VALUES)
+        else:
+            is_bex_s = pd.Series(False, index=df.index)
+    else:
+        is_bex_s = stores_up.isin(bex_list)
+
+    # one document per output path (BEX|NON_BEX/<store>): the zip used to get duplicate
+    # entries with the same name here; now we keep only the last row (a store that is
+    # BEX in one row and NON-BEX in another still gets both documents)
+    dup = pd.DataFrame({"store": stores_up, "bex": is_bex_s}).duplicated(keep="last")
+    if dup.any():
+        st.warning(f"⚠️ Αγνοήθηκαν {int(dup.sum())} διπλές γραμμές store (κρατήθηκε η τελευταία).")
+        df, stores_up, is_bex_s = df[~dup], stores_up[~dup], is_bex_s[~dup]
+
+    # rows are plain tuples in the loop → resolve column positions once
+    col_pos = {c: j for j, c in enumerate(df.columns)}
 
     built = 0
-    total_rows = len(df) if not test_mode else min(50, len(df))
     pbar = st.progress(0.0, text="Ξεκίνησε…")
 
     percent_keys = {"plan_vs_target", "voice_vs_target", "fixed_vs_target"}
 
-    for i, (_, row) in enumerate(df.head(total_rows).iterrows(), start=1):
-        try:
-            store = str(safe_get(row, store_col)).strip().upper()
-            if not store:
-                pbar.progress(i/total_rows, text=f"Παράλειψη {i} (κενό store)")
+    # 1) placeholder mappings, built lazily (main thread) as the render window has room
+    letter_pos = {k: col_pos.get(c) for k, c in letter_to_col.items()}
+    # blank/unknown letters give "" on every row → set once, loop only over the active ones
+    blank_fields = {k: "" for k, j in letter_pos.items() if j is None}
+    active_fields = [(k, j, k in percent_keys) for k, j in letter_pos.items() if j is not None]
+    # tidy numbers / format percents column by column, so the loop only copies values
+    col_vals = column_values(df)
+    field_keys = [k for k, _, _ in active_fields]
+    field_cols = [[format_percent(v) for v in col_vals[j]] if is_percent else col_vals[j]
+                  for _, j, is_percent in active_fields]
+    field_rows = zip(*field_cols) if field_cols else repeat(())
+    col_names = list(df.columns)
+    next_month = (TODAY.replace(day=1) + dt.timedelta(days=32)).replace(day=1)
+    plan_month = f"Review {TODAY.strftime('%B %Y')} — Plan {next_month.strftime('%B %Y')}"
+    title_prefix = f"{plan_month} — "
+    row_base = {"plan_month": plan_month, **blank_fields}  # same on every row, merged in one update
+    rows = zip(df.index, stores_up, is_bex_s, zip(*col_vals), field_rows)
+
+    def iter_jobs() -> Iterator[tuple]:
+        """Yield (row number, zip entry name, template parts, mapping) one row at a time."""
+        for idx, store, is_bex, row, fields in rows:
+            i = idx + 1
+            try:
+                tpl_parts = tpl_bex_parts if is_bex else tpl_non_parts
+
+                # every df column as [[<header>]]; the fixed/letter fields below take precedence
+                mapping: Dict[str, Any] = dict(zip(col_names, row))
+                mapping.update(row_base)
+                mapping["title"] = title_prefix + store
+                mapping["store"] = store
+                mapping["bex"] = "YES" if is_bex else "NO"
+
+                # fill mapped numeric/text fields from letters
+                mapping.update(zip(field_keys, fields))
+
+                out_name = f"{'BEX' if is_bex else 'NON_BEX'}/{store}_ReviewPlan.docx"
+            except Exception as e:
+                st.warning(f"⚠️ Σφάλμα στη γραμμή {i}: {e}")
                 continue
+            yield i, out_name, tpl_parts, mapping
 
-            is_bex = _is_bex(row)
-            tpl_bytes = tpl_bex_bytes if is_bex else tpl_non_bytes
-
-            # build mapping for placeholders
-            next_month = (TODAY.replace(day=1) + dt.timedelta(days=32)).replace(day=1)
-            mapping: Dict[str, Any] = {
-                "title": f"Review {TODAY.strftime('%B %Y')} — Plan {next_month.strftime('%B %Y')} — {store}",
-                "store": store,
-                "plan_month": f"Review {TODAY.strftime('%B %Y')} — Plan {next_month.strftime('%B %Y')}",
-                "bex": "YES" if is_bex else "NO",
-            }
-
-            # fill mapped numeric/text fields from letters
-            for key, colname in letter_to_col.items():
-                val = safe_get(row, colname)
-                if key in percent_keys:
-                    mapping[key] = format_percent(val)
-                else:
-                    mapping[key] = val
-
-            # also expose every df column as [[<header>]] if needed
-            for col in df.columns:
-                mapping.setdefault(col, safe_get(row, col))
-
-            # create docx
-            doc = Document(io.BytesIO(tpl_bytes))
-            replace_placeholders_robust(doc, mapping)
-
-            out_name = f"{'BEX' if is_bex else 'NON_BEX'}/{store}_ReviewPlan.docx"
-            buf = io.BytesIO()
-            doc.save(buf)
-            zf.writestr(out_name, buf.getvalue())
-            built += 1
-            pbar.progress(i/total_rows, text=f"Φτιάχνω: {out_name} ({i}/{total_rows})")
-        except Exception as e:
-            st.warning(f"⚠️ Σφάλμα στη γραμμή {i}: {e}")
-
-    zf.close()
-    pbar.empty()
-
-    if built == 0:
-        st.error("Δεν δημιουργήθηκε αρχείο. Έλεγξε templates & mapping.")
-    else:
-        st.success(f"Έτοιμα {built} αρχεία.")
-        st.download_button("⬇️ Κατέβασε ZIP", data=out_zip.getvalue(), file_name="reviews_from_excel.zip")
+    # 2) render the .docx files in parallel; the zip is written from this thread only
+    # (the archive goes to a temp file on disk, not into RAM; removed even on rerun/stop)
+    out_zip = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+    try:
+        with out_zip, zipfile.ZipFile(out_zip, "w", zipfile.ZIP_STORED) as zf:  # .docx is already deflated
+            last_update = 0.0
+            for i, out_name, fut in render_in_order(iter_jobs(), RENDER_WORKERS, RENDER_WINDOW):
+                try:
+                    zf.writestr(zip_entry(out_name, zipfile.ZIP_STORED), fut.result())
+                    built += 1
+                except Exception as e:
+                    st.warning(f"⚠️ Σφάλμα στη γραμμή {i}: {e}")
+                # each progress() is a websocket round-trip → refresh a few times per second
+                now = time.monotonic()
+                if now - last_update >= PROGRESS_INTERVAL:
+                    pbar.progress(i/total_rows, text=f"Φτιάχνω: {out_name} ({i}/{total_rows})")
+                    last_update = now
+        pbar.empty()
+
+        if built == 0:
+            st.error("Δεν δημιουργήθηκε αρχείο. Έλεγξε templates & mapping.")
+        else:
+            st.success(f"Έτοιμα {built} αρχεία.")
+            with open(out_zip.name, "rb") as fh:
+                st.download_button("⬇️ Κατέβασε ZIP", data=fh, file_name="reviews_from_excel.zip",
+                                   mime="application/zip", on_click="ignore")
+    finally:
+        os.unlink(out_zip.name)
 
     if debug and len(df):
         with st.expander("🔍 Πρώτη γραμμή (mapping που περάσαμε στο DOCX)"):
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# τα tests κάνουν import τα helpers από το app.py (Streamlit σε bare mode, χωρίς UI)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,108 @@
+import io
+
+import openpyxl
+import pytest
+
+import app
+
+
+TEXT_CODES = ["ABC0", "ABC1", "ABC2", "ABC3", "00042"]
+
+
+def make_xlsx() -> bytes:
+    """Sheet με κενή στήλη χωρίς header (E), store codes (1100 αριθμοί, μετά κείμενο)
+    και στήλη τιμών (H) που ανακατεύει αριθμούς με "-" / "N/A"."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.append(["Shop Code", "mobile_actual", "fixed_plan", "note", None, "plan_vs_target", "extra", "voice_vs_target"])
+    for i in range(1100):
+        ws.append([1000 + i, i * 0.5, i, "x", None, i / 700, "t", "-" if i % 7 == 0 else i / 900])
+    for code in TEXT_CODES:
+        ws.append([code, 1.5, 2, "y", None, 0.87, None, "N/A"])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def read_both(xls_bytes, **kw):
+    slow = app.read_sheet(xls_bytes, "Sheet1", **kw)
+    fast = app.read_sheet(xls_bytes, "Sheet1", fast=True, text_cols=(0,), **kw)
+    return slow, fast
+
+
+@pytest.mark.skipif(not app.HAS_POLARS, reason="polars/fastexcel/pyarrow δεν είναι εγκατεστημένα")
+def test_polars_reader_matches_pandas():
+    """Ο Polars reader πρέπει να δίνει τις ίδιες στήλες (θέσεις γραμμάτων) και τιμές με τον pandas."""
+    xls_bytes = make_xlsx()
+    slow, fast = read_both(xls_bytes)
+    assert slow.shape == fast.shape == (1105, 8)
+    assert app.normalize_headers(fast.columns) == app.normalize_headers(slow.columns)
+    for j in range(slow.shape[1]):
+        assert app.text_column(fast.iloc[:, j]).tolist() == app.text_column(slow.iloc[:, j]).tolist()
+    # οι κωδικοί-κείμενο μετά από 1100 αριθμητικούς δεν χάνονται
+    assert app.text_column(fast.iloc[:, 0]).tolist()[-5:] == TEXT_CODES
+
+
+@pytest.mark.skipif(not app.HAS_POLARS, reason="polars/fastexcel/pyarrow δεν είναι εγκατεστημένα")
+def test_polars_reader_keeps_numbers_in_mixed_columns():
+    """Στήλη τιμών με "-" / "N/A": οι αριθμοί πρέπει να στρογγυλεύονται όπως με τον pandas reader."""
+    slow, fast = read_both(make_xlsx())
+    assert app.column_values(fast.iloc[:, 1:]) == app.column_values(slow.iloc[:, 1:])  # store μένει κείμενο (text_cols)
+    for j in (5, 7):  # plan_vs_target, voice_vs_target → percent fields
+        pct_slow = [app.format_percent(v) for v in app.column_values(slow.iloc[:, [j]])[0]]
+        pct_fast = [app.format_percent(v) for v in app.column_values(fast.iloc[:, [j]])[0]]
+        assert pct_fast == pct_slow
+    assert pct_fast[:3] == ["-", "0%", "0%"] and pct_fast[-1] == ""  # "N/A" → NaN, όπως στον pandas
+
+
+@pytest.mark.skipif(not app.HAS_POLARS, reason="polars/fastexcel/pyarrow δεν είναι εγκατεστημένα")
+def test_polars_reader_keeps_positions_with_usecols():
+    """Header pass + usecols μετά την κενή στήλη E πρέπει να πέφτουν στις ίδιες στήλες."""
+    xls_bytes = make_xlsx()
+    slow, fast = read_both(xls_bytes, max_rows=0)
+    assert list(app.normalize_headers(fast.columns)) == list(app.normalize_headers(slow.columns))
+    slow, fast = read_both(xls_bytes, usecols=(0, 5, 7))
+    assert app.normalize_headers(fast.columns) == app.normalize_headers(slow.columns)
+    assert app.text_column(fast.iloc[:, 1]).tolist() == app.text_column(slow.iloc[:, 1]).tolist()
+    assert app.column_values(fast.iloc[:, 1:]) == app.column_values(slow.iloc[:, 1:])  # store μένει κείμενο (text_cols)
+
+
+def test_openpyxl_header_pass_keeps_unheaded_columns(monkeypatch):
+    """Με openpyxl το header pass (nrows=0) έβλεπε μόνο όσες στήλες έχει η γραμμή headers."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws.append(["store", "x"])
+    ws.append(["DRZ01", 1, "c-value"])
+    ws.append(["FKM01", 2, None])
+    buf = io.BytesIO()
+    wb.save(buf)
+    monkeypatch.setattr(app, "EXCEL_ENGINE", "openpyxl")
+    app.open_workbook.clear()
+    app.read_sheet.clear()
+    try:
+        head = app.read_sheet(buf.getvalue(), "Sheet1", max_rows=0)
+        assert app.normalize_headers(head.columns) == ["store", "x", "unnamed_2"]
+        assert app.col_by_letter(head, "C") == "Unnamed: 2"
+        df = app.read_sheet(buf.getvalue(), "Sheet1", usecols=(0, 2))
+        assert app.text_column(df.iloc[:, 1]).tolist() == ["c-value", ""]
+        # θέση πέρα από τα δεδομένα → κενή στήλη, όχι σφάλμα
+        df = app.read_sheet(buf.getvalue(), "Sheet1", usecols=(0, 5))
+        assert app.text_column(df.iloc[:, 1]).tolist() == ["", ""]
+    finally:
+        app.open_workbook.clear()
+        app.read_sheet.clear()
+
+
+@pytest.mark.skipif(not app.HAS_POLARS, reason="polars/fastexcel/pyarrow δεν είναι εγκατεστημένα")
+def test_polars_reader_does_not_open_workbook_with_pandas(monkeypatch):
+    """fast=True: μόνο ο Polars reader ανοίγει το αρχείο, και το λάθος sheet δίνει το ίδιο μήνυμα."""
+    def fail(_):
+        raise AssertionError("open_workbook() στο fast path")
+    monkeypatch.setattr(app, "open_workbook", fail)
+    xls_bytes = make_xlsx()
+    app.read_sheet.clear()
+    assert app.read_sheet(xls_bytes, "Sheet1", max_rows=0, fast=True).shape[1] == 8
+    with pytest.raises(ValueError, match="δεν βρέθηκε.*Sheet1"):
+        app.read_sheet(xls_bytes, "Nope", fast=True)
@@ -0,0 +1,104 @@
+import io
+import zipfile
+
+from docx import Document
+
+import app
+
+
+def render(doc, mapping):
+    """Template (python-docx Document) → prepare_template → render_docx → νέο Document."""
+    buf = io.BytesIO()
+    doc.save(buf)
+    parts = app.prepare_template(buf.getvalue())
+    out = bytes(app.render_docx(parts, mapping))
+    return Document(io.BytesIO(out)), out
+
+
+def para_with_runs(doc, *texts):
+    p = doc.add_paragraph()
+    for k, t in enumerate(texts):
+        p.add_run(t).bold = k % 2 == 1  # διαφορετικό formatting → το Word τα κρατά σε ξεχωριστά runs
+    return p
+
+
+def test_placeholder_split_over_two_runs():
+    doc = Document()
+    para_with_runs(doc, "Κατάστημα: [[sto", "re]] τέλος")
+    out, _ = render(doc, {"store": "DRZ01"})
+    assert out.paragraphs[0].text == "Κατάστημα: DRZ01 τέλος"
+
+
+def test_placeholder_split_over_three_runs():
+    doc = Document()
+    para_with_runs(doc, "[[", "mobile_", "plan]]!")
+    out, _ = render(doc, {"mobile_plan": 42})
+    assert out.paragraphs[0].text == "42!"
+
+
+def test_adjacent_placeholders():
+    doc = Document()
+    para_with_runs(doc, "[[a]][[", "b]]-[[c]]")
+    out, _ = render(doc, {"a": "1", "b": "2", "c": "3"})
+    assert out.paragraphs[0].text == "12-3"
+
+
+def test_header_and_footer_are_filled():
+    doc = Document()
+    doc.add_paragraph("body [[store]]")
+    doc.sections[0].header.paragraphs[0].text = "H [[store]]"
+    doc.sections[0].footer.paragraphs[0].text = "F [[plan_month]]"
+    out, _ = render(doc, {"store": "FKM01", "plan_month": "Plan"})
+    assert out.paragraphs[0].text == "body FKM01"
+    assert out.sections[0].header.paragraphs[0].text == "H FKM01"
+    assert out.sections[0].footer.paragraphs[0].text == "F Plan"
+
+
+def test_missing_key_renders_empty():
+    doc = Document()
+    doc.add_paragraph("x[[nope]]y")
+    out, _ = render(doc, {})
+    assert out.paragraphs[0].text == "xy"
+
+
+def test_values_are_xml_escaped():
+    doc = Document()
+    doc.add_paragraph("[[v]]")
+    out, raw = render(doc, {"v": "A & B <tag> \"q\""})
+    assert out.paragraphs[0].text == "A & B <tag> \"q\""
+    xml = zipfile.ZipFile(io.BytesIO(raw)).read("word/document.xml")
+    assert b"A &amp; B &lt;tag&gt;" in xml
+
+
+def test_illegal_xml_chars_are_dropped():
+    """π.χ. _x000B_ από το Excel → \\x0b: το .docx πρέπει να ανοίγει."""
+    doc = Document()
+    doc.add_paragraph("[[v]]")
+    out, _ = render(doc, {"v": "a\x0bb\x00c"})
+    assert out.paragraphs[0].text == "abc"
+
+
+def test_newlines_and_tabs_become_breaks():
+    doc = Document()
+    doc.add_paragraph("[[v]]")
+    out, raw = render(doc, {"v": "line1\nline2\r\nline3\tend"})
+    assert out.paragraphs[0].text == "line1\nline2\nline3\tend"
+    xml = zipfile.ZipFile(io.BytesIO(raw)).read("word/document.xml")
+    assert xml.count(b"<w:br/>") == 2 and b"<w:tab/>" in xml
+
+
+def test_leading_trailing_spaces_are_preserved():
+    doc = Document()
+    doc.add_paragraph("[[v]]")
+    _, raw = render(doc, {"v": "  pad  "})
+    xml = zipfile.ZipFile(io.BytesIO(raw)).read("word/document.xml")
+    assert b'<w:t xml:space="preserve">  pad  </w:t>' in xml
+
+
+def test_extract_placeholders_sees_all_text_parts():
+    doc = Document()
+    para_with_runs(doc, "[[sto", "re]] [[a]]")
+    doc.sections[0].footer.paragraphs[0].text = "[[f]]"
+    buf = io.BytesIO()
+    doc.save(buf)
+    assert app.extract_placeholders(app.prepare_template(buf.getvalue())) == {"store", "a", "f"}
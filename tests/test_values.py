@@ -0,0 +1,42 @@
+import math
+
+import pandas as pd
+
+import app
+
+
+def test_column_values_tidies_numbers_per_column():
+    """NaN → "", ακέραιοι float → int (όχι 221.0), δεκαδικά στρογγυλεύονται σε 1 ψηφίο."""
+    df = pd.DataFrame({
+        "whole": [221.0, 13.0, 255.0],
+        "frac": [2.25, float("nan"), 0.87],
+        "mixed": ["abc", 1.0, None],
+        "ints": [1, 2, 3],
+    })
+    whole, frac, mixed, ints = app.column_values(df)
+    assert whole == [221, 13, 255] and all(type(v) is int for v in whole)
+    assert frac == [2.2, "", 0.9]
+    assert mixed == ["abc", 1, ""]
+    assert ints == [1, 2, 3]
+
+
+def test_column_values_feed_format_percent():
+    """Το percent pass δουλεύει πάνω στις ήδη tidy τιμές (1.22 → 1.2 → 120%, όπως το safe_get), τα κενά μένουν κενά."""
+    (vals,) = app.column_values(pd.DataFrame({"p": [1.22, 0.87, math.nan, 95.0]}))
+    assert [app.format_percent(v) for v in vals] == ["120%", "90%", "", "95%"]
+
+
+def test_text_column_integral_floats():
+    """Κωδικοί που διαβάστηκαν ως 101.0 → "101", τα NaN → ""."""
+    s = pd.Series([101.0, float("nan"), 7.0])
+    assert app.text_column(s).tolist() == ["101", "", "7"]
+
+
+def test_text_column_fractional_floats_are_tidied():
+    s = pd.Series([2.25, float("nan"), 3.0])
+    assert app.text_column(s).tolist() == ["2.2", "", "3"]
+
+
+def test_text_column_mixed_object_column():
+    s = pd.Series([" drz01 ", 1000, 2.0, None, "ABC0"], dtype=object)
+    assert app.text_column(s).tolist() == ["drz01", "1000", "2", "", "ABC0"]